@@ -0,0 +1,282 @@
+import numpy as np
+import pandas as pd
+import matplotlib as mpl
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+# Shared pipeline of the create_pipe_database_* scripts: read a manufacturer Excel template,
+# assign block colors, emit one <NetworkPipe> per row and merge the new pipes into the pipe DB.
+
+# Short column names so that itertuples() can expose them as attributes
+COLUMNS = {
+    'Hersteller': 'manufacturer',
+    'Produkt': 'product',
+    'Typ': 'pipe_type',
+    'Einzel- oder Doppelrohr': 'layout',
+    'Material de': 'material_de',
+    'Material en': 'material_en',
+    'Material Rohrwand': 'material_wall',
+    'Außendurchmesser [mm]': 'da_mm',
+    'Wandstärke [mm]': 's_mm',
+    'Rohrrauigkeit [mm]': 'roughness_mm',
+    'PN [bar]': 'pn_bar',
+    'Dichte Rohrwand [W/mK]': 'density_wall',
+    'Wärmekapazität Rohrwand [W/mK]': 'cp_wall',
+    'Wärmeleitfähigkeit Rohrwand [W/mK]': 'conductivity_wall',
+    'Abstand Vor- und Rücklauf [mm]': 'spacing_mm',
+    'U-Wert [W/mK]': 'u_value',
+    'Außendurchmesser gesamt mit Isolierung und Schutzschicht [mm]': 'da_total_mm',
+    'Dicke der Isolierung [mm]': 'thickness_insulation_mm',
+    'Wärmeleitfähigkeit der Isolierung [mm]': 'lambda_insulation',
+    'Dicke äußere Schutzschicht [mm]': 'thickness_outer_mm',
+}
+
+# Columns holding the values of IBK:Parameter and NominalPressure entries
+PARAM_COLUMNS = [
+    'da_mm', 's_mm', 'roughness_mm', 'pn_bar', 'density_wall', 'cp_wall', 'conductivity_wall',
+    'spacing_mm', 'u_value', 'da_total_mm', 'thickness_insulation_mm', 'lambda_insulation',
+    'thickness_outer_mm',
+]
+
+# Color mapping setup
+cmap = mpl.colormaps['turbo']
+
+# Frame of a generated XML file (UTF-8 bytes)
+XML_HEADER = b'<?xml version="1.0" encoding="UTF-8" ?>\n<NetworkPipes>\n'
+XML_FOOTER = b'</NetworkPipes>\n'
+
+# Line templates of the generated XML, attribute order: id, color, categoryName, productName, manufacturerName
+PIPE_OPEN = '\t<NetworkPipe id="{id}" color="{color}" categoryName="{cat}" productName="{prod}" manufacturerName="{mfr}">\n'
+PIPE_CLOSE = '\t</NetworkPipe>\n'
+PARAM = '\t\t<IBK:Parameter name="{n}" unit="{u}">{v}</IBK:Parameter>\n'
+ELEMENT = '\t\t<{tag}>{text}</{tag}>\n'
+
+# Helper to format numeric values to match original XML (no .0 for integers)
+def fmt_val(val):
+    if pd.isna(val):
+        return ""
+    try:
+        f_val = float(val)
+        if f_val.is_integer():
+            return str(int(f_val))
+        return str(f_val)
+    except:
+        return str(val)
+
+# Helpers appending the XML lines of a pipe to the output buffer
+def add_ibk_param(parts, param_name, value, unit):
+    if value is not None:
+        parts.append(PARAM.format(n=param_name, u=unit, v=fmt_val(value)))
+
+def add_element(parts, tag, text):
+    parts.append(ELEMENT.format(tag=tag, text=text))
+
+# Function to add total_number, color_count and color columns per diameter block
+def add_colors(df, diam_col='da_mm'):
+    # (a new block starts wherever the diameter decreases)
+    da_arr = df[diam_col].to_numpy()
+    blocks = (np.diff(da_arr, prepend=da_arr[:1]) < 0).cumsum()
+    groups = df.groupby(blocks)
+    df['total_number'] = groups[diam_col].transform('size')
+    df['color_count'] = groups.cumcount()
+
+    # Map every row onto the colormap in one call
+    ratios = df['color_count'].to_numpy() / df['total_number'].to_numpy()
+    df['color'] = [mpl.colors.rgb2hex(c, keep_alpha=False) for c in cmap(ratios)]
+    return df
+
+# Function to replace missing parameter values by None with one isna() call per column,
+# so the per-pipe checks are plain `is not None` tests
+def none_for_missing(df):
+    df = df.copy()
+    for col in PARAM_COLUMNS:
+        if col in df.columns:
+            values = np.array(df[col], dtype=object)
+            values[pd.isna(values)] = None
+            df[col] = pd.Series(values, index=df.index, dtype=object)
+    return df
+
+# Function to load a sheet of an Excel template, optionally filtered by product name
+def read_pipes(excel_path, sheet_name=0, product_filter=None):
+    # Only the columns listed in COLUMNS are consumed; a callable tolerates sheets lacking some of them
+    df = pd.read_excel(excel_path, sheet_name=sheet_name, skiprows=1, engine='calamine',
+                       usecols=lambda col: col in COLUMNS)
+    df = df.dropna(subset=['Produkt', 'Außendurchmesser [mm]'], how='all')
+    if product_filter is not None:
+        df = df[df['Produkt'].str.contains(product_filter, case=False, na=False)].reset_index(drop=True)
+    df = df.rename(columns=COLUMNS)
+    return add_colors(df)
+
+# Function to load one entry of an input_files list (top-level so worker processes can run it)
+def load_input(file_info):
+    return read_pipes(file_info['path'], file_info.get('sheet', 0), file_info.get('filter'))
+
+# Function to format all rows of a DataFrame as <NetworkPipe> entries with ids after last_id.
+# pipe_fn(row) returns (cat_name, product_name, manufacturer, body) where body holds the
+# child element lines built with add_ibk_param/add_element. Missing parameter values reach
+# pipe_fn as None.
+def build_pipes(df, pipe_fn, last_id):
+    df = none_for_missing(df)
+    parts = []
+    for pipe_id, row in enumerate(df.itertuples(index=False, name='Row'), start=last_id + 1):
+        cat_name, product_name, manufacturer, body = pipe_fn(row)
+        parts.append(PIPE_OPEN.format(id=pipe_id, color=row.color, cat=cat_name, prod=product_name, mfr=manufacturer))
+        parts.extend(body)
+        parts.append(PIPE_CLOSE)
+    return "".join(parts)
+
+# Function to find the last id="<digits>" attribute in a byte buffer, None if there is none
+def find_last_id(buf):
+    pos = len(buf)
+    while True:
+        pos = buf.rfind(b'id="', 0, pos)
+        if pos == -1:
+            return None
+        end = buf.find(b'"', pos + 4)
+        value = buf[pos + 4:end]
+        if end != -1 and value.isdigit():
+            return int(value)
+
+# Function to get the last ID from the existing XML (robustly)
+def get_last_id(xml_path, block_size=1 << 16):
+    if not os.path.exists(xml_path):
+        return 1100000
+    try:
+        # The last pipe sits at the end of the file, so the file is searched backwards block by
+        # block and usually only the last block is read
+        with open(xml_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            carry = b''
+            while end > 0:
+                start = max(0, end - block_size)
+                f.seek(start)
+                buf = f.read(end - start) + carry
+                last_id = find_last_id(buf)
+                if last_id is not None:
+                    return last_id
+                # keep the head of this block so an attribute split between blocks is found
+                carry = buf[:64]
+                end = start
+    except Exception as e:
+        print(f"Error finding last ID in {xml_path}: {e}")
+    return 1100000
+
+# Function to find the byte offset of the closing root tag by reading only the file tail
+def find_closing_tag(xml_path, tag=b'</NetworkPipes>', tail_size=1 << 16):
+    with open(xml_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - tail_size))
+        tail = f.read()
+    pos = tail.rfind(tag)
+    if pos == -1:
+        return -1
+    return size - len(tail) + pos
+
+# Function to copy the first n bytes of src to dst in blocks
+def copy_bytes(src, dst, n, block_size=1 << 20):
+    while n > 0:
+        buf = src.read(min(block_size, n))
+        if not buf:
+            break
+        dst.write(buf)
+        n -= len(buf)
+
+# Function to count the pipes of an XML file block by block
+def count_pipes(xml_path, pattern=b'<NetworkPipe ', block_size=1 << 20):
+    total = 0
+    carry = b''
+    with open(xml_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            buf = carry + block
+            total += buf.count(pattern)
+            # keep a tail shorter than the pattern to catch matches across blocks
+            carry = buf[-(len(pattern) - 1):]
+    return total
+
+# Function to insert the new pipes (UTF-8 bytes) before </NetworkPipes> of the DB and print a summary
+def merge_into_db(db_xml_file, updated_db_file, new_pipes_data, added_counts):
+    summary = []
+
+    if not os.path.exists(db_xml_file):
+        print(f"Warning: {db_xml_file} not found.")
+        return
+
+    # Count original entries - the trailing space avoids matching <NetworkPipes>
+    original_count = count_pipes(db_xml_file)
+    summary.append(f"{db_xml_file}: {original_count} entries")
+
+    insertion_point = find_closing_tag(db_xml_file)
+    if insertion_point == -1:
+        print("Error: Could not find </NetworkPipes> in original DB.")
+        return
+
+    # Stream the original DB around the new chunk instead of loading it into memory
+    with open(db_xml_file, 'rb') as src, open(updated_db_file, 'wb', buffering=1 << 20) as dst:
+        copy_bytes(src, dst, insertion_point)
+        dst.write(new_pipes_data)
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+    # New counts for summary
+    for out_file, c in added_counts.items():
+        summary.append(f"{out_file}: {c} entries")
+
+    final_count = original_count + sum(added_counts.values())
+    summary.append(f"{updated_db_file}: {final_count} entries")
+
+    print("\n--- Processing Summary ---")
+    for line in summary:
+        print(line)
+
+# Function to convert all input_files, write one XML per file and merge them into the DB.
+# Each entry of input_files is a dict with 'path' and 'out' and optionally 'sheet' and 'filter'.
+def run(input_files, db_xml_file, updated_db_file, pipe_fn):
+    # Get the initial last ID
+    current_id_counter = get_last_id(db_xml_file)
+    print(f"Initial ID: {current_id_counter}")
+
+    for file_info in input_files:
+        print(f"Processing {file_info['path']}...")
+
+    # Reading the Excel files dominates, so several of them are loaded in parallel.
+    # The ids are assigned afterwards, in input order.
+    if len(input_files) > 1:
+        with ProcessPoolExecutor() as ex:
+            frames = list(ex.map(load_input, input_files))
+    else:
+        frames = [load_input(file_info) for file_info in input_files]
+
+    # We will collect all new chunks to append to the final DB
+    new_chunks = []
+    # Number of pipes written per output file
+    added_counts = {}
+
+    for file_info, df in zip(input_files, frames):
+        individual_out = file_info['out']
+        file_pipes_chunk = build_pipes(df, pipe_fn, current_id_counter)
+        # Increment ID across all files
+        current_id_counter += len(df)
+
+        # Encode once, the bytes go into the individual file and the merged DB
+        file_pipes_data = file_pipes_chunk.encode('utf-8')
+
+        # Save individual file
+        with open(individual_out, 'wb', buffering=1 << 20) as f:
+            f.write(XML_HEADER)
+            f.write(file_pipes_data)
+            f.write(XML_FOOTER)
+        print(f"Created {individual_out}")
+        added_counts[individual_out] = len(df)
+
+        # Accumulate for global merge
+        new_chunks.append(file_pipes_data)
+
+    # Total entries added count
+    print(f"\nTotal entries added: {sum(added_counts.values())}")
+
+    # Final Merge and Summary
+    merge_into_db(db_xml_file, updated_db_file, b"".join(new_chunks), added_counts)
+
+    print("\nAll files processed successfully.")
@@ -1,5 +1,6 @@
 from scipy.optimize import brentq
 import math
+import numpy as np
 
 def calculate_insulation_thickness(
         UValue: float,
@@ -53,8 +54,13 @@ def calculate_insulation_thickness(
         # 1. Required total thermal resistance for the target U-Value
         r_total_required = math.pi / UValue
 
+        # Loop-invariant factors of the layer resistances, bound once for the solver
+        inv_2_lin = 0.5 / lambdaInsulation
+        inv_2_lwall = 0.5 / lambdaWall
+        ln = math.log
+
         # 2. Resistance of the inner wall layer (constant)
-        r_wall_inner = (1 / (2 * lambdaWall)) * math.log(da / di)
+        r_wall_inner = inv_2_lwall * ln(da / di)
         
         # Check if the wall alone already meets the requirement
         if r_wall_inner >= r_total_required:
@@ -69,19 +75,15 @@ def calculate_insulation_thickness(
                 # Resistance with no insulation
                 return r_wall_inner - r_total_required
             
-            # Resistance of the insulation layer
-            r_insulation = (1 / (2 * lambdaInsulation)) * math.log((da + 2 * d_ins) / da)
-            
-            # Resistance of the outer protective layer
-            r_wall_outer = (1 / (2 * lambdaWall)) * math.log(
-                (da + 2 * d_ins + 2 * dOuterLayer) / (da + 2 * d_ins)
-            )
-            
-            # Total calculated resistance for a given d_ins
-            r_calculated = r_wall_inner + r_insulation + r_wall_outer
-            
-            # The residual: we want this to be zero
-            return r_calculated - r_total_required
+            # Outer diameter of the insulation layer
+            d1 = da + 2 * d_ins
+
+            # Total calculated resistance (inner wall + insulation + outer protective layer)
+            # minus the required one: we want this to be zero
+            return (r_wall_inner
+                    + inv_2_lin * ln(d1 / da)
+                    + inv_2_lwall * ln((d1 + 2 * dOuterLayer) / d1)
+                    - r_total_required)
 
         # --- Numerical Solver ---
         
@@ -119,3 +121,87 @@ def calculate_insulation_thickness(
         except ValueError as e:
             # This catches errors from brentq if it fails to converge
             raise RuntimeError(f"Numerical solver failed to find a solution: {e}")
+
+
+def calculate_insulation_thickness_vec(
+        UValue,
+        lambdaInsulation,
+        lambdaWall,
+        di,
+        da,
+        dOuterLayer,
+        max_thickness: float = 1.0,
+        iterations: int = 5
+    ) -> np.ndarray:
+        """
+        Vectorized version of `calculate_insulation_thickness` for whole columns of pipes.
+
+        Without an outer layer the heat transfer equation is solved in closed form:
+            dInsulation = 0.5 * (da * exp(2 * lambdaInsulation * (r_total_required - r_wall_inner)) - da)
+        With an outer layer this closed form (which ignores the thin outer layer) is used as
+        the starting value of a fixed number of Newton iterations, applied to all pipes at once.
+
+        Args:
+            UValue (array_like): The target overall heat transfer coefficient [W/(m*K)].
+            lambdaInsulation (array_like): Thermal conductivity of the insulation material [W/(m*K)].
+            lambdaWall (array_like): Thermal conductivity of the main wall/pipe material [W/(m*K)].
+            di (array_like): Inner diameter of the pipe/wall [m].
+            da (array_like): Outer diameter of the pipe/wall (inner diameter of insulation) [m].
+            dOuterLayer (array_like): Thickness of the outer protective layer [m].
+            max_thickness (float, optional): The upper bound for the insulation thickness [m].
+                                             Defaults to 1.0 meter.
+            iterations (int, optional): Number of Newton iterations. Defaults to 5.
+
+        Returns:
+            np.ndarray: The required insulation thickness per pipe [m].
+                        0.0 where no insulation is needed.
+
+        Raises:
+            ValueError: If any input parameters are not physically valid or if the target U-Value
+                        of any pipe cannot be achieved with the maximum insulation thickness.
+        """
+        UValue, lambdaInsulation, lambdaWall, di, da, dOuterLayer = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float) for a in (UValue, lambdaInsulation, lambdaWall, di, da, dOuterLayer))
+        )
+
+        # --- Input Validation ---
+        if np.any(UValue <= 0):
+            raise ValueError("UValue must be positive.")
+        if np.any(lambdaInsulation <= 0) or np.any(lambdaWall <= 0):
+            raise ValueError("Thermal conductivities (lambdaInsulation, lambdaWall) must be positive.")
+        if not np.all((di > 0) & (da > 0) & (dOuterLayer >= 0)):
+            raise ValueError("All diameters and thicknesses must be positive (dOuterLayer can be zero).")
+        if np.any(da <= di):
+            raise ValueError("Outer diameter (da) must be greater than inner diameter (di).")
+
+        # --- Calculation Setup ---
+        r_total_required = np.pi / UValue
+        inv_2_lin = 0.5 / lambdaInsulation
+        inv_2_lwall = 0.5 / lambdaWall
+        r_wall_inner = inv_2_lwall * np.log(da / di)
+        r_missing = r_total_required - r_wall_inner
+
+        # Closed form, exact without outer layer
+        d_ins = 0.5 * (da * np.exp(r_missing / inv_2_lin) - da)
+
+        # Newton iterations on f(d) = r_insulation(d) + r_wall_outer(d) - r_missing
+        has_outer = dOuterLayer > 0
+        if np.any(has_outer):
+            for _ in range(iterations):
+                d1 = da + 2 * d_ins
+                d2 = d1 + 2 * dOuterLayer
+                f = inv_2_lin * np.log(d1 / da) + inv_2_lwall * np.log(d2 / d1) - r_missing
+                f_prime = 2 * inv_2_lin / d1 + inv_2_lwall * (2 / d2 - 2 / d1)
+                d_ins = np.where(has_outer, np.maximum(d_ins - f / f_prime, 0.0), d_ins)
+
+        # No insulation needed where the base wall already meets the target U-Value
+        d_ins = np.where(r_missing <= 0, 0.0, d_ins)
+
+        if np.any(d_ins > max_thickness):
+            raise ValueError(
+                f"Target U-Value of {np.count_nonzero(d_ins > max_thickness)} pipe(s) is too low to be "
+                f"achieved even with {max_thickness*1000:.1f} mm of insulation. "
+                f"Try increasing max_thickness or using a better insulation material (lower lambda)."
+            )
+
+        return d_ins